@@ -1,6 +1,7 @@
 """
 GUI widgets.
 """
+import numpy as np
 import pyqtgraph as pg
 import pandas as pd
 from enum import Enum
@@ -34,7 +35,6 @@ from cranio.model import (
     session_scope,
     Patient,
     EventType,
-    Measurement,
     Session,
     Database,
 )
@@ -335,8 +335,10 @@ class PatientWidget(QWidget):
         """
         self.select_widget.clear()
         with session_scope(self.database) as session:
-            for patient in session.query(Patient).all():
-                self.select_widget.addItem(patient.patient_id)
+            patient_ids = [
+                patient_id for patient_id, in session.query(Patient.patient_id)
+            ]
+        self.select_widget.addItems(patient_ids)
 
     def patient_count(self) -> int:
         """
@@ -521,19 +523,13 @@ class MeasurementWidget(QWidget):
         time_arr = datetime_to_seconds(
             index_arr, self.producer_process.document.started_at
         )
-        # Create measurements and insert to database
-        measurements = []
-        for time_s, value_dict in zip(time_arr, value_dict_arr):
-            m = Measurement(
-                time_s=time_s,
-                torque_Nm=value_dict['torque (Nm)'],
-                document_id=self.producer_process.document.document_id,
-            )
-            measurements.append(m)
-        self.database.bulk_insert(measurements)
-        # Convert data to DataFrame
-        x, y = zip(*[(float(m.time_s), float(m.torque_Nm)) for m in measurements])
-        df = pd.DataFrame({'torque (Nm)': y}, index=x)
+        torque_arr = [value_dict['torque (Nm)'] for value_dict in value_dict_arr]
+        # Insert measurements to database
+        self.producer_process.document.insert_time_series(
+            self.database, time_arr, torque_arr
+        )
+        # Convert data to DataFrame directly from the arrays
+        df = pd.DataFrame({'torque (Nm)': torque_arr}, index=time_arr)
         # Append to plot
         self.plot(df, mode=PlotMode.APPEND)
 
@@ -569,8 +565,10 @@ class PlotWidget(pg.PlotWidget):
 
     def __init__(self, parent=None):
         super(PlotWidget, self).__init__(parent)
-        self.x_arr = []
-        self.y_arr = []
+        # Plotted data is stored in preallocated buffers of which the first _n values are in use
+        self._x = np.empty(0)
+        self._y = np.empty(0)
+        self._n = 0
         self.init_ui()
         self.filters = []
 
@@ -578,6 +576,57 @@ class PlotWidget(pg.PlotWidget):
         """ Initialize UI elements. """
         self.showGrid(True, True, 0.1)
         self.enable_interaction(False)
+        # Render at most ~viewport width points (peak method preserves spikes)
+        self.setDownsampling(auto=True, mode='peak')
+        self.setClipToView(True)
+
+    @property
+    def x_arr(self) -> List[float]:
+        """ Plotted x values. """
+        return self._x[: self._n].tolist()
+
+    @property
+    def y_arr(self) -> List[float]:
+        """ Plotted y values. """
+        return self._y[: self._n].tolist()
+
+    @property
+    def _x_data(self) -> np.ndarray:
+        """ Plotted x values without copying. The view is invalidated by the next plot() or clear_plot() call. """
+        return self._x[: self._n]
+
+    def _set_data(self, x: Iterable[float], y: Iterable[float]):
+        """
+        Replace plotted data.
+
+        :param x:
+        :param y:
+        :return:
+        """
+        self._x = np.array(x, dtype=np.float64)
+        self._y = np.array(y, dtype=np.float64)
+        self._n = len(self._x)
+
+    def _append_data(self, x: Iterable[float], y: Iterable[float]):
+        """
+        Append to plotted data. Buffer capacity is doubled when full so that appending is amortized O(len(x)).
+
+        :param x:
+        :param y:
+        :return:
+        """
+        x = np.asarray(x, dtype=np.float64)
+        y = np.asarray(y, dtype=np.float64)
+        n = self._n + len(x)
+        if n > len(self._x):
+            capacity = max(n, 2 * len(self._x))
+            for name in ('_x', '_y'):
+                buffer = np.empty(capacity)
+                buffer[: self._n] = getattr(self, name)[: self._n]
+                setattr(self, name, buffer)
+        self._x[self._n : n] = x
+        self._y[self._n : n] = y
+        self._n = n
 
     @property
     def x_label(self):
@@ -586,9 +635,7 @@ class PlotWidget(pg.PlotWidget):
 
     @x_label.setter
     def x_label(self, value):
-        if value is None:
-            value = ''
-        self.setLabel('bottom', value)
+        self._set_axis_label('bottom', value)
 
     @property
     def y_label(self):
@@ -597,9 +644,22 @@ class PlotWidget(pg.PlotWidget):
 
     @y_label.setter
     def y_label(self, value):
+        self._set_axis_label('left', value)
+
+    def _set_axis_label(self, axis: str, value: Union[str, None]):
+        """
+        Set axis label. Assigning the label that is already shown is a no-op to avoid a redundant relayout.
+
+        :param axis: Axis name (e.g., 'bottom' or 'left')
+        :param value: Label text. None is interpreted as an empty label.
+        :return:
+        """
         if value is None:
             value = ''
-        self.setLabel('left', value)
+        axis_item = self.getAxis(axis)
+        if axis_item.label.isVisible() and axis_item.labelText == value:
+            return
+        self.setLabel(axis, value)
 
     def enable_interaction(self, enable: bool):
         """
@@ -617,8 +677,7 @@ class PlotWidget(pg.PlotWidget):
 
         :return:
         """
-        self.x_arr = []
-        self.y_arr = []
+        self._set_data([], [])
         return self.getPlotItem().clear()
 
     def plot(
@@ -637,17 +696,18 @@ class PlotWidget(pg.PlotWidget):
         :raises ValueError: if invalid plot mode argument
         """
         if mode == PlotMode.OVERWRITE:
-            self.x_arr = list(x)
-            self.y_arr = list(y)
+            self._set_data(x, y)
         elif mode == PlotMode.APPEND:
-            self.x_arr += list(x)
-            self.y_arr += list(y)
+            self._append_data(x, y)
         else:
             raise ValueError('Invalid mode {}'.format(mode))
         # Apply filters
         self.apply_filters()
         self.getPlotItem().plot(
-            self.x_arr, self.y_arr, clear=True, **self.plot_configuration
+            self._x[: self._n],
+            self._y[: self._n],
+            clear=True,
+            **self.plot_configuration,
         )
         return self
 
@@ -658,9 +718,13 @@ class PlotWidget(pg.PlotWidget):
         :return:
         """
         for filter_func in self.filters:
-            i_arr = [i for i, x in enumerate(list(filter_func(self.x_arr))) if x]
-            self.x_arr = [self.x_arr[i] for i in i_arr]
-            self.y_arr = [self.y_arr[i] for i in i_arr]
+            x, y = self._x[: self._n], self._y[: self._n]
+            mask = np.fromiter(filter_func(x), dtype=bool, count=self._n)
+            # Compact in place to keep the buffer capacity for the following appends
+            n = int(mask.sum())
+            self._x[:n] = x[mask]
+            self._y[:n] = y[mask]
+            self._n = n
 
     def add_filter(self, filter_func):
         """
@@ -884,6 +948,11 @@ class RegionPlotWidget(QWidget):
         """ Plot x values property. """
         return self.plot_widget.x_arr
 
+    @property
+    def _x_data(self) -> np.ndarray:
+        """ Plot x values without copying. The view is invalidated by the next plot() call. """
+        return self.plot_widget._x_data
+
     @property
     def y_arr(self):
         """ Plot y values property. """
@@ -967,7 +1036,7 @@ class RegionPlotWidget(QWidget):
         :return:
         """
         if bounds is None:
-            bounds = [min(self.x_arr), max(self.x_arr)]
+            bounds = [float(self._x_data.min()), float(self._x_data.max())]
         alpha = 125
         color = list(color_palette[len(self.region_edit_map)]) + [alpha]
         item = pg.LinearRegionItem(
@@ -983,6 +1052,27 @@ class RegionPlotWidget(QWidget):
         self.region_edit_map[item] = edit_widget
         return edit_widget
 
+    def add_regions(
+        self,
+        edges_list: Iterable[Tuple[float, float]],
+        bounds: Tuple[float, float] = None,
+        movable: bool = True,
+    ) -> List[RegionEditWidget]:
+        """
+        Add multiple regions to the plot. Default bounds are computed once for all regions.
+
+        :param edges_list: Edges for each region
+        :param bounds: Region bounds
+        :param movable:
+        :return: List of RegionEditWidgets in insertion order
+        """
+        if bounds is None:
+            bounds = [float(self._x_data.min()), float(self._x_data.max())]
+        return [
+            self.add_region(edges, bounds=bounds, movable=movable)
+            for edges in edges_list
+        ]
+
     def remove_region(self, edit_widget: RegionEditWidget):
         """
         Remove specified region from the plot.
@@ -1015,17 +1105,20 @@ class RegionPlotWidget(QWidget):
         """
         count = self.get_add_count()
         logger.debug(f'{type(self).__name__} add button clicked (add count={count})')
-        if len(self.x_arr) == 0:
+        if len(self._x_data) == 0:
             logger.error('Unable to add region to empty plot')
             return 0
         if count > 0:
-            x_min = min(self.x_arr)
-            interval = (max(self.x_arr) - x_min) / count
-            for i in range(count):
-                # insert at uniform intervals
-                low = x_min + i * interval
-                high = x_min + (i + 1) * interval
-                self.add_region([low, high])
+            x_min, x_max = float(self._x_data.min()), float(self._x_data.max())
+            interval = (x_max - x_min) / count
+            # insert at uniform intervals
+            self.add_regions(
+                [
+                    [x_min + i * interval, x_min + (i + 1) * interval]
+                    for i in range(count)
+                ],
+                bounds=[x_min, x_max],
+            )
 
     def remove_all(self):
         """
@@ -1054,6 +1147,8 @@ class VMultiPlotWidget(QWidget):
     def __init__(self, parent=None):
         super(VMultiPlotWidget, self).__init__(parent=parent)
         self.plot_widgets = []
+        # Plot widgets indexed by label for constant-time lookup
+        self._plot_widgets_by_label = {}
         self.title_label = QLabel()
         self.main_layout = QVBoxLayout()
         self.init_ui()
@@ -1083,9 +1178,7 @@ class VMultiPlotWidget(QWidget):
         :param label: Plot label, or y-axis name
         :return:
         """
-        for p in self.plot_widgets:
-            if p.y_label == label:
-                return p
+        return self._plot_widgets_by_label.get(label)
 
     def add_plot_widget(self, label: str):
         """
@@ -1113,6 +1206,7 @@ class VMultiPlotWidget(QWidget):
         if PLOT_N_SECONDS is not None:
             plot_widget.add_filter(partial(filter_last_n_seconds, n=PLOT_N_SECONDS))
         self.plot_widgets.append(plot_widget)
+        self._plot_widgets_by_label[label] = plot_widget
         return plot_widget
 
     def plot(
@@ -1130,18 +1224,16 @@ class VMultiPlotWidget(QWidget):
         # The DataFrame is appended during recording
         # The real-time plot is updated at specified intervals
         self.title = title
-        # Find already initialized columns
-        initialized_columns = [p.y_label for p in self.plot_widgets if p.y_label in df]
-        # Leftover columns need to be initialized
-        non_initialized_columns = filter(
-            lambda c: c not in initialized_columns, df.columns
-        )
-        for c in non_initialized_columns:
-            self.add_plot_widget(c)
-        # Plot each column
-        for c in df:
+        # Columns without a plot widget need to be initialized
+        for c in df.columns:
+            if c not in self._plot_widgets_by_label:
+                self.add_plot_widget(c)
+        # Plot each column as a slice of one array instead of per-column Series
+        x = df.index.values
+        values = df.values
+        for i, c in enumerate(df.columns):
             plot_widget = self.find_plot_widget_by_label(c)
-            plot_widget.plot(x=df.index, y=df[c], mode=mode)
+            plot_widget.plot(x=x, y=values[:, i], mode=mode)
 
     def clear(self):
         """
@@ -1161,3 +1253,4 @@ class VMultiPlotWidget(QWidget):
         for p in self.plot_widgets:
             remove_widget_from_layout(self.main_layout, p)
         self.plot_widgets = []
+        self._plot_widgets_by_label = {}
@@ -18,6 +18,7 @@ from sqlalchemy import (
     create_engine,
     CheckConstraint,
     event,
+    func,
     Table,
 )
 from cranio.utils import generate_unique_id, utc_datetime, logger
@@ -52,14 +53,15 @@ class Database:
         }
         return cls(**connect_args)
 
-    def create_engine(self) -> Engine:
+    def create_engine(self, **kwargs) -> Engine:
         """
         Initialize a database connection and return the database engine.
 
+        :param kwargs: Keyword arguments passed to sqlalchemy.create_engine
         :return:
         """
         logger.info(f'Initialize database {self.url}')
-        self.engine = create_engine(self.url)
+        self.engine = create_engine(self.url, **kwargs)
         # Enforce sqlite foreign keys
         event.listen(self.engine, 'connect', _fk_pragma_on_connect)
         return self.engine
@@ -85,19 +87,24 @@ class Database:
     def session_scope(self):
         return session_scope(self)
 
-    def insert(self, row: Table, insert_if_exists: bool = True) -> Table:
+    def insert(
+        self, row: Table, insert_if_exists: bool = True, session: 'SQLSession' = None
+    ) -> Table:
         """
         Insert row to the database.
 
         :param row:
         :param insert_if_exists:
+        :param session: Open session to insert the row in. If None, the row is inserted in a new transaction.
         :return: Inserted row
         """
-        with session_scope(self) as s:
-            if insert_if_exists:
-                s.add(row)
-            else:
-                s.merge(row)
+        if session is None:
+            with session_scope(self) as s:
+                return self.insert(row, insert_if_exists=insert_if_exists, session=s)
+        if insert_if_exists:
+            session.add(row)
+        else:
+            session.merge(row)
         return row
 
     def bulk_insert(self, rows: Iterable[Table]) -> List[Table]:
@@ -108,8 +115,7 @@ class Database:
         :return:
         """
         with session_scope(self) as s:
-            for row in rows:
-                s.add(row)
+            s.add_all(rows)
         return rows
 
     def clear(self) -> None:
@@ -338,14 +344,16 @@ class Document(Base, DictMixin):
         """
         x, y = list(), list()
         with session_scope(database) as s:
-            measurements = (
-                s.query(Measurement)
+            # Select only the needed columns instead of hydrating Measurement objects
+            rows = (
+                s.query(Measurement.time_s, Measurement.torque_Nm)
                 .filter(Measurement.document_id == self.document_id)
+                .order_by(Measurement.measurement_id)
                 .all()
             )
-            if len(measurements) == 0:
-                return x, y
-            x, y = zip(*[(float(m.time_s), float(m.torque_Nm)) for m in measurements])
+        if len(rows) == 0:
+            return x, y
+        x, y = zip(*[(float(t), float(torque)) for t, torque in rows])
         return x, y
 
     def get_related_events(self, database: Database) -> List['AnnotatedEvent']:
@@ -362,6 +370,20 @@ class Document(Base, DictMixin):
             )
         return events
 
+    def get_related_events_count(self, database: Database) -> int:
+        """
+        Return number of annotated events related to the document.
+
+        :return:
+        """
+        with session_scope(database) as s:
+            count = (
+                s.query(func.count(AnnotatedEvent.event_num))
+                .filter(AnnotatedEvent.document_id == self.document_id)
+                .scalar()
+            )
+        return count
+
     def get_related_sensor_info(self, database: Database) -> SensorInfo:
         """
         Return SensorInfo object related to the document.
@@ -378,7 +400,7 @@ class Document(Base, DictMixin):
 
     def insert_time_series(
         self, database: Database, time_s: Iterable[float], torque_Nm: Iterable[float]
-    ) -> List['Measurement']:
+    ) -> None:
         """
         Insert torque as a function of time to database.
 
@@ -387,13 +409,15 @@ class Document(Base, DictMixin):
         :param torque_Nm:
         :return:
         """
-        # Insert entire time series in one transaction
-        measurements = [
-            Measurement(document_id=self.document_id, time_s=x, torque_Nm=y)
+        rows = [
+            {'document_id': self.document_id, 'time_s': x, 'torque_Nm': y}
             for x, y in zip(time_s, torque_Nm)
         ]
-        database.bulk_insert(measurements)
-        return measurements
+        if len(rows) == 0:
+            return
+        # Insert entire time series in one transaction as a single executemany
+        with session_scope(database) as s:
+            s.execute(Measurement.__table__.insert(), rows)
 
 
 class AnnotatedEvent(Base, DictMixin):
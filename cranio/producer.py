@@ -4,7 +4,7 @@ Data producers and processes.
 import datetime
 import time
 import multiprocessing as mp
-import pandas as pd
+from queue import Empty
 import numpy as np
 from typing import Iterable, List, Tuple
 from contextlib import contextmanager
@@ -28,8 +28,12 @@ def get_all_from_queue(queue) -> Tuple[List, List]:
     :return: Index and value arrays as a tuple
     """
     index_arr, value_arr = [], []
-    while not queue.empty():
-        index, value = queue.get()
+    # Drain until empty without an extra empty() call per item
+    while True:
+        try:
+            index, value = queue.get_nowait()
+        except Empty:
+            break
         index_arr.append(index)
         value_arr.append(value)
     return index_arr, value_arr
@@ -45,14 +49,13 @@ def datetime_to_seconds(
     :param t0: Reference datetime against which the time difference is calculated
     :return: Float iterable
     """
-    # Conversion to pd.Timestamp for datetime and np.datetime support
-    def to_total_seconds(x):
-        return (pd.Timestamp(x) - t0).total_seconds()
-
-    try:
-        return list(map(to_total_seconds, array))
-    except TypeError:
-        return to_total_seconds(array)
+    # Vectorized datetime64 subtraction supports datetime and np.datetime64
+    seconds = (
+        np.asarray(array, dtype='datetime64[ns]') - np.datetime64(t0, 'ns')
+    ) / np.timedelta64(1, 's')
+    if seconds.ndim == 0:
+        return float(seconds)
+    return seconds.tolist()
 
 
 @contextmanager
@@ -234,6 +237,8 @@ class ProducerProcess:
 
     # Default producer class
     producer_class = Producer
+    # Seconds to wait for start_event per iteration while paused
+    pause_poll_interval = 0.1
 
     def __init__(self, name: str, document: Document):
         self.queue = mp.Queue()
@@ -278,8 +283,8 @@ class ProducerProcess:
         with open_port(self.producer):
             # Read until stopped
             while not self.stop_event.is_set():
-                # Read only if started
-                if self.start_event.is_set():
+                # Read only if started. Block while paused instead of busy looping.
+                if self.start_event.wait(timeout=self.pause_poll_interval):
                     self.producer.read(queue=self.queue)
         logger.info('Stopping producer process "{}"'.format(str(self)))
 
@@ -309,7 +309,7 @@ class NoteState(MyState):
     def onEntry(self, event: QEvent):
         super().onEntry(event)
         # Set default full turn count
-        event_count = len(self.document.get_related_events(self.database))
+        event_count = self.document.get_related_events_count(self.database)
         with session_scope(self.database) as s:
             sensor_info = (
                 s.query(SensorInfo)
@@ -2,16 +2,18 @@
 Utility functions and classes.
 """
 import os
+import copy
 import sys
 import time
 import logging
 import logging.config
-import random
 import uuid
 from datetime import datetime
 from contextlib import suppress
+from functools import lru_cache
 from pathlib import Path
-from typing import Union, Dict
+from typing import Union, Dict, Iterator
+import numpy as np
 from ruamel import yaml
 from PyQt5.QtCore import QStateMachine
 from cranio.constants import DEFAULT_LOGGING_CONFIG_PATH
@@ -83,6 +85,13 @@ def get_logging_config(path: Union[Path, str] = None) -> dict:
     """
     if path is None:
         path = DEFAULT_LOGGING_CONFIG_PATH
+    # Return a copy because logging.config.dictConfig modifies the dictionary
+    return copy.deepcopy(_load_logging_config(str(path)))
+
+
+@lru_cache(maxsize=None)
+def _load_logging_config(path: str) -> dict:
+    """ Read and parse a logging configuration file. The result is cached by path. """
     with open(path) as stream:
         return yaml.safe_load(stream)
 
@@ -116,9 +125,41 @@ def log_level_to_name(level: int) -> str:
     return logging._levelToName[level]
 
 
+def standard_normal_values(
+    batch_size: int = 1000, random_state: np.random.RandomState = None
+) -> Iterator[float]:
+    """
+    Yield random values from the standard normal distribution.
+    The values are generated with NumPy in batches.
+
+    :param batch_size: Number of values generated at a time
+    :param random_state: Random state. Defaults to a new random state seeded from OS entropy.
+    :return:
+    """
+    if random_state is None:
+        random_state = np.random.RandomState()
+    while True:
+        yield from random_state.standard_normal(batch_size).tolist()
+
+
+# Value stream and the id of the process that created it
+_standard_normal_values = None
+_standard_normal_values_pid = None
+
+
 def random_value_generator() -> float:
-    """ Generate a random value. """
-    return random.gauss(0, 1)
+    """
+    Generate a random value.
+    A forked process inherits the parent's value stream, so a new stream is started whenever the process id changes.
+
+    :return:
+    """
+    global _standard_normal_values, _standard_normal_values_pid
+    pid = os.getpid()
+    if pid != _standard_normal_values_pid:
+        _standard_normal_values = standard_normal_values()
+        _standard_normal_values_pid = pid
+    return next(_standard_normal_values)
 
 
 def default_excepthook(exctype: Exception, value: str, tb):
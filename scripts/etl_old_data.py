@@ -5,10 +5,17 @@ import sqlite3
 import pandas as pd
 import matplotlib.pyplot as plt
 
-from contextlib import contextmanager
 from pathlib import Path
 from cranio.imada import decode_telegram, TelegramError
-from sqlalchemy import create_engine, Column, Integer, String, Float, ForeignKey
+from sqlalchemy import (
+    create_engine,
+    select,
+    Column,
+    Integer,
+    String,
+    Float,
+    ForeignKey,
+)
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 
@@ -18,20 +25,6 @@ engine = create_engine('sqlite:///craniodistractor.db', echo=False)
 SQLSession.configure(bind=engine)
 
 
-@contextmanager
-def sqlsession_scope():
-    '''Provide a transactional scope around a series of operations.'''
-    session = SQLSession()
-    try:
-        yield session
-        session.commit()
-    except:
-        session.rollback()
-        raise
-    finally:
-        session.close()
-
-
 class Patient(Base):
     __tablename__ = 'patient'
 
@@ -75,10 +68,13 @@ def transform(df: pd.DataFrame) -> pd.DataFrame:
     return df_out
 
 
-def load_to_db(df: pd.DataFrame, sqlsession):
+def load_to_db(df: pd.DataFrame, connection, chunk_size: int = 5000):
     df_out = df.rename({'torque (Nm)': 'torque_Nm', 'time (s)': 'time_s'}, axis=1)
-    data = [Data(**series.to_dict()) for _, series in df_out.iterrows()]
-    sqlsession.add_all(data)
+    # Core executemany in chunks (no ORM unit-of-work overhead)
+    # Object dtype keeps per-column native Python types (DataFrame.values would upcast int ids to float)
+    rows = df_out.astype(object).to_dict('records')
+    for i in range(0, len(rows), chunk_size):
+        connection.execute(Data.__table__.insert(), rows[i : i + chunk_size])
     return df_out
 
 
@@ -90,38 +86,53 @@ fpath_in = Path(
 # iterate through each patient folder
 folders = [x for x in fpath_in.iterdir() if 'rawPatient' in x.name]
 for folder in folders:
-    with sqlsession_scope() as sqlsession:
+    with engine.begin() as connection:
         # folder name as patient_alias
         patient_alias = folder.stem
-        patient = Patient(patient_alias=patient_alias)
-        sqlsession.add(patient)
-        # flush to realize autoincrement patient_id
-        sqlsession.flush()
-        # iterate over data files
+        result = connection.execute(
+            Patient.__table__.insert().values(patient_alias=patient_alias)
+        )
+        patient_id = result.inserted_primary_key[0]
+        # iterate over data files and extract and transform data
         txt_files = [x for x in folder.iterdir() if x.suffix == '.txt']
+        session_data = {}
         for f in txt_files:
             # path stem/basename as session_name
             session_name = f.stem
-            session = Session(session_name=session_name, patient_id=patient.patient_id)
             try:
-                # extract and transform data
-                df_data = transform(extract(f))
-                sqlsession.add(session)
-                # flush to realize autoincrement session_id
-                sqlsession.flush()
-                df_data['session_id'] = session.session_id
-                data = load_to_db(df_data, sqlsession)
-                print(
-                    'Patient {} - session {} loaded to database'.format(
-                        patient.patient_id, session_name
-                    )
-                )
+                session_data[session_name] = transform(extract(f))
             except TelegramError:
                 print(
                     'Failed to load Patient {} - session {} (TelegramError)'.format(
-                        patient.patient_id, session_name
+                        patient_id, session_name
                     )
                 )
+        if not session_data:
+            continue
+        # insert all patient sessions at once
+        connection.execute(
+            Session.__table__.insert(),
+            [
+                {'session_name': session_name, 'patient_id': patient_id}
+                for session_name in session_data
+            ],
+        )
+        # read back autoincrement session_ids
+        session_ids = dict(
+            connection.execute(
+                select([Session.session_name, Session.session_id]).where(
+                    Session.patient_id == patient_id
+                )
+            ).fetchall()
+        )
+        for session_name, df_data in session_data.items():
+            df_data['session_id'] = session_ids[session_name]
+            data = load_to_db(df_data, connection)
+            print(
+                'Patient {} - session {} loaded to database'.format(
+                    patient_id, session_name
+                )
+            )
 
 # query: number of rows in each table
 sqlsession = SQLSession()
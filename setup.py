@@ -9,7 +9,7 @@ setup(
     extras_require={
         'dev': [],
         'lint': ['black'],
-        'test': ['pytest', 'pytest-cov', 'pytest-helpers-namespace'],
+        'test': ['pytest', 'pytest-cov', 'pytest-helpers-namespace', 'pytest-xdist'],
         'docs': ['sphinx', 'sphinx-autodoc-typehints', 'm2r'],
     },
     scripts=['scripts/sqlite-to-csv.py'],
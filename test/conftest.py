@@ -1,27 +1,122 @@
+import os
+import time
 import pytest
 import logging
 import logging.config
-from typing import Tuple
-from cranio.model import Database, Session, Patient, Document, SensorInfo
+from pathlib import Path
+from typing import Tuple, Callable
+
+# Run Qt without a display server unless a platform is chosen explicitly.
+# Must be set before cranio.app creates the QApplication.
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PyQt5.QtCore import QEventLoop
+from sqlalchemy import event
+from sqlalchemy.pool import StaticPool
+from cranio.model import (
+    Database,
+    Session,
+    Patient,
+    Document,
+    SensorInfo,
+    SQLSession,
+)
 from cranio.utils import get_logging_config, generate_unique_id, utc_datetime, logger
 from cranio.producer import ProducerProcess
 from cranio.state_machine import StateMachine
 from cranio.app import app
 from config import Config
 
+SENSOR_INFO = {'sensor_serial_number': 'pytest', 'turns_in_full_turn': 3}
 
-@pytest.fixture(scope='function')
-def database_fixture():
+
+def _disable_pysqlite_transactions(dbapi_con, con_record):
+    dbapi_con.isolation_level = None
+
+
+def _emit_begin(con):
+    con.execute('BEGIN')
+
+
+@pytest.fixture(scope='session')
+def database_engine_fixture():
+    """ In-memory SQLite database. Tables are created and populated once per test session. """
     database = Database(drivername='sqlite')
-    database.create_engine()
+    # Single in-memory connection shared by all threads
+    database.create_engine(
+        poolclass=StaticPool, connect_args={'check_same_thread': False}
+    )
+    # Let SQLAlchemy emit BEGIN so that pysqlite supports SAVEPOINT
+    event.listen(database.engine, 'connect', _disable_pysqlite_transactions)
+    event.listen(database.engine, 'begin', _emit_begin)
     database.init()
+    # Static sensor info is entered once instead of once per test
+    database.insert(get_sensor_info())
     yield database
     database.clear()
+    database.engine.dispose()
+
+
+@pytest.fixture(scope='session')
+def shared_database_fixture():
+    """ Database object shared by all tests. database_fixture binds it to a per-test connection. """
+    database = Database(drivername='sqlite')
+    database.initialized = True
+    yield database
+
+
+@pytest.fixture(scope='function')
+def database_fixture(database_engine_fixture, shared_database_fixture):
+    """
+    Database bound to a connection with an external transaction (and a savepoint) that is rolled back after the test.
+    Sessions opened via session_scope() join the external transaction so their commits are discarded.
+    """
+    connection = database_engine_fixture.engine.connect()
+    transaction = connection.begin()
+    # Failing statements roll back to the savepoint instead of ending the external transaction
+    savepoint = connection.begin_nested()
+
+    def release_savepoint(session):
+        # Keep committed work when a later statement fails
+        nonlocal savepoint
+        savepoint.commit()
+        savepoint = connection.begin_nested()
+
+    def restart_savepoint(session, session_transaction):
+        nonlocal savepoint
+        if not savepoint.is_active:
+            savepoint = connection.begin_nested()
+
+    event.listen(SQLSession, 'after_commit', release_savepoint)
+    event.listen(SQLSession, 'after_transaction_end', restart_savepoint)
+    database = shared_database_fixture
+    database.engine = connection
+    yield database
+    database.engine = None
+    event.remove(SQLSession, 'after_commit', release_savepoint)
+    event.remove(SQLSession, 'after_transaction_end', restart_savepoint)
+    if savepoint.is_active:
+        savepoint.rollback()
+    transaction.rollback()
+    connection.close()
+
+
+@pytest.fixture
+def sql_session(database_fixture):
+    """ Session joined to the per-test transaction. Committed (to the savepoint) after the test. """
+    with database_fixture.session_scope() as s:
+        yield s
 
 
 @pytest.fixture(scope='session', autouse=True)
-def logging_fixture():
-    logging.config.dictConfig(get_logging_config())
+def logging_fixture(tmp_path_factory):
+    config = get_logging_config()
+    # Log to the pytest temporary directory (separate for each pytest-xdist worker) instead of the working directory
+    file_handler = config['handlers']['file']
+    file_handler['filename'] = str(
+        tmp_path_factory.mktemp('log') / Path(file_handler['filename']).name
+    )
+    logging.config.dictConfig(config)
 
 
 @pytest.fixture
@@ -36,37 +131,81 @@ def producer_process():
     assert not p.is_alive()
 
 
+@pytest.fixture(scope='session')
+def state_machine_fixture(database_engine_fixture, shared_database_fixture):
+    """ StateMachine shared by all tests. Use the machine fixtures to get a started machine. """
+    database = shared_database_fixture
+    # Widgets query the database on initialization
+    database.engine = database_engine_fixture.engine
+    state_machine = StateMachine(database=database)
+    database.engine = None
+    yield state_machine
+    stop_machine(state_machine)
+
+
+def process_events(max_time_ms: int = 10):
+    """ Process pending Qt events for at most max_time_ms milliseconds. """
+    app.processEvents(QEventLoop.AllEvents, max_time_ms)
+
+
+def reset_machine(state_machine: StateMachine, producer_process: ProducerProcess):
+    """ Reset state machine context left over from previous tests. """
+    state_machine.document = None
+    state_machine.annotated_events = None
+    state_machine.patient_id = ''
+    state_machine.main_window.sensor = None
+    state_machine.main_window.measurement_widget.clear()
+    state_machine.main_window.producer_process = producer_process
+    logger.register_machine(state_machine)
+
+
+def stop_machine(state_machine: StateMachine):
+    """ Stop the state machine and kill the producer. """
+    # Active state is not exited on stop -> stop the measurement update timer explicitly
+    state_machine.main_window.measurement_widget.update_timer.stop()
+    if state_machine.producer_process.is_alive():
+        state_machine.producer_process.join()
+    state_machine.stop()
+    process_events()
+
+
 @pytest.fixture(scope='function')
-def machine(producer_process, database_fixture):
-    state_machine = StateMachine(database=database_fixture)
+def machine(producer_process, database_fixture, state_machine_fixture):
+    state_machine = state_machine_fixture
+    reset_machine(state_machine, producer_process)
     state_machine.session = add_session(database_fixture)
     state_machine.patient_id = add_patient(database_fixture).patient_id
-    logger.register_machine(state_machine)
-    state_machine.main_window.producer_process = producer_process
     # Connect and register dummy sensor
     state_machine.main_window.connect_dummy_sensor()
     state_machine.main_window.register_sensor_with_producer()
     state_machine.start()
-    app.processEvents()
+    process_events()
+    assert state_machine.in_state(state_machine.s0)
     yield state_machine
-    # Kill producer
-    state_machine.producer_process.join()
-    state_machine.stop()
+    stop_machine(state_machine)
 
 
 @pytest.fixture
-def machine_without_patient(producer_process, database_fixture):
-    state_machine = StateMachine(database=database_fixture)
+def machine_without_patient(producer_process, database_fixture, state_machine_fixture):
+    state_machine = state_machine_fixture
+    reset_machine(state_machine, producer_process)
     state_machine.session = add_session(database_fixture)
-    logger.register_machine(state_machine)
-    state_machine.main_window.producer_process = producer_process
     state_machine.start()
-    app.processEvents()
+    process_events()
+    assert state_machine.in_state(state_machine.s0)
     yield state_machine
-    # kill producer
-    if state_machine.producer_process.is_alive():
-        state_machine.producer_process.join()
-    state_machine.stop()
+    stop_machine(state_machine)
+
+
+@pytest.helpers.register
+def wait_until(condition: Callable[[], bool], timeout: float = 2.0) -> bool:
+    """ Poll condition until it is true or timeout (seconds) expires. Return the last condition value. """
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
 
 
 @pytest.helpers.register
@@ -92,21 +231,23 @@ def add_patient(database: Database) -> Patient:
 
 
 @pytest.helpers.register
-def add_sensor_info(database: Database) -> SensorInfo:
-    with database.session_scope() as s:
-        sensor_info = SensorInfo(sensor_serial_number='pytest', turns_in_full_turn=3)
-        s.add(sensor_info)
-    return sensor_info
+def get_sensor_info() -> SensorInfo:
+    """ Return the test sensor info. It is entered to the database once per test session. """
+    return SensorInfo(**SENSOR_INFO)
 
 
 @pytest.helpers.register
 def add_document_and_foreign_keys(
     database: Database,
 ) -> Tuple[Document, Patient, Session, SensorInfo]:
-    session = add_session(database)
-    patient = add_patient(database)
-    sensor_info = add_sensor_info(database)
+    sensor_info = get_sensor_info()
+    # Insert the document and its foreign keys in a single transaction
     with database.session_scope() as s:
+        session = Session()
+        patient = Patient(patient_id=generate_unique_id())
+        s.add_all([session, patient])
+        # Flush to generate the session id
+        s.flush()
         document = Document(
             session_id=session.session_id,
             patient_id=patient.patient_id,
@@ -8,16 +8,29 @@ from cranio.app.window import RegionPlotWindow
 left_edge = 0
 right_edge = 99
 region_count = 4
-wait_msec = 500
+dummy_edges = (left_edge, (left_edge + right_edge) / 2)
+# Plotted data is generated once per module with a fixed seed
+x_data = np.linspace(left_edge, right_edge, 100)
+y_data = np.random.RandomState(0).rand(len(x_data))
 
 
-@pytest.fixture
-def region_plot_widget():
+@pytest.fixture(scope='module')
+def plotted_region_plot_widget():
     widget = RegionPlotWidget()
-    # plot random data
-    x = np.linspace(left_edge, right_edge, 100)
-    y = np.random.rand(len(x))
-    widget.plot(x, y)
+    widget.plot(x_data, y_data)
+    yield widget
+
+
+@pytest.fixture
+def empty_region_plot_widget(plotted_region_plot_widget):
+    widget = plotted_region_plot_widget
+    yield widget
+    widget.remove_all()
+
+
+@pytest.fixture
+def region_plot_widget(empty_region_plot_widget):
+    widget = empty_region_plot_widget
     # add regions using add button
     widget.set_add_count(region_count)
     widget.add_button_clicked()
@@ -26,7 +39,7 @@ def region_plot_widget():
 
 def add_dummy_region(widget: RegionPlotWidget) -> RegionEditWidget:
     """ Helper function. """
-    return widget.add_region((left_edge, (left_edge + right_edge) / 2))
+    return widget.add_region(dummy_edges)
 
 
 def test_annotated_event_can_be_flagged_as_undone_and_not_recorded(database_fixture,):
@@ -79,66 +92,51 @@ def test_annotated_event_number_matches_region_edit_widget_number(region_plot_wi
         assert event.event_num == edit_widget.event_number
 
 
-def test_region_count_is_zero_when_no_regions_are_added(region_plot_widget):
-    # remove all regions
-    region_plot_widget.remove_all()
-    assert region_plot_widget.region_count() == 0
+def test_region_count_is_zero_when_no_regions_are_added(empty_region_plot_widget):
+    assert empty_region_plot_widget.region_count() == 0
 
 
-def test_event_numbering_starts_from_one(region_plot_widget):
-    # remove all regions
-    region_plot_widget.remove_all()
-    edit_widget = add_dummy_region(region_plot_widget)
+def test_event_numbering_starts_from_one(empty_region_plot_widget):
+    edit_widget = add_dummy_region(empty_region_plot_widget)
     assert edit_widget.event_number == 1
 
 
-def test_event_number_increases_by_one_for_each_added_region(region_plot_widget):
-    # remove all regions
-    region_plot_widget.remove_all()
-    for i in range(region_count):
-        edit_widget = add_dummy_region(region_plot_widget)
-        assert edit_widget.event_number == i + 1
+def test_event_number_increases_by_one_for_each_added_region(empty_region_plot_widget):
+    edit_widgets = empty_region_plot_widget.add_regions([dummy_edges] * region_count)
+    assert [w.event_number for w in edit_widgets] == list(range(1, region_count + 1))
 
 
-def test_event_numbering_by_insertion_order(region_plot_widget):
-    # remove all regions
-    region_plot_widget.remove_all()
+def test_event_numbering_by_insertion_order(empty_region_plot_widget):
     # add 4 regions
-    for i in range(4):
-        edit_widget = add_dummy_region(region_plot_widget)
+    *_, edit_widget = empty_region_plot_widget.add_regions([dummy_edges] * 4)
     assert edit_widget.event_number == 4
     # remove 2
-    edit_widget = region_plot_widget.remove_at(index=3)
+    edit_widget = empty_region_plot_widget.remove_at(index=3)
     assert edit_widget.event_number == 4
-    edit_widget = region_plot_widget.remove_at(index=2)
+    edit_widget = empty_region_plot_widget.remove_at(index=2)
     assert edit_widget.event_number == 3
     # add 1
-    edit_widget = add_dummy_region(region_plot_widget)
+    edit_widget = add_dummy_region(empty_region_plot_widget)
     assert edit_widget.event_number == 3
 
 
 def test_region_plot_window_can_be_initialized_from_document_data(database_fixture,):
     # generate data and associate with document
-    n = 100
     document, *_ = pytest.helpers.add_document_and_foreign_keys(database_fixture)
-    x_arr = np.linspace(left_edge, right_edge, n)
-    y_arr = np.random.rand(n)
-    document.insert_time_series(database_fixture, x_arr, y_arr)
+    document.insert_time_series(database_fixture, x_data, y_data)
     region_plot_window = RegionPlotWindow()
     region_plot_window.plot(*document.get_related_time_series(database_fixture))
-    np.testing.assert_array_almost_equal(region_plot_window.x_arr, x_arr)
-    np.testing.assert_array_almost_equal(region_plot_window.y_arr, y_arr)
+    assert np.array_equal(region_plot_window.x_arr, x_data)
+    # Numeric columns are returned with 10 decimals
+    assert np.allclose(region_plot_window.y_arr, y_data, rtol=0, atol=1e-10)
 
 
 def test_annotated_events_inserted_to_database_after_ok_on_region_plot_window_is_clicked(
     database_fixture,
 ):
     # generate data and associate with document
-    n = 100
     document, *_ = pytest.helpers.add_document_and_foreign_keys(database_fixture)
-    x_arr = np.linspace(left_edge, right_edge, n)
-    y_arr = np.random.rand(n)
-    document.insert_time_series(database_fixture, x_arr, y_arr)
+    document.insert_time_series(database_fixture, x_data, y_data)
     region_plot_window = RegionPlotWindow()
     region_plot_window.plot(*document.get_related_time_series(database_fixture))
     # add regions using add button
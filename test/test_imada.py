@@ -2,10 +2,25 @@ import pytest
 from cranio.imada import decode_telegram, Imada
 from cranio.producer import Sensor
 from cranio.model import SensorInfo
+from cranio.exc import TelegramError
 
 
-def test_decode_telegram():
-    assert (-1.234, 'K', 'T', 'O') == decode_telegram('-1.234KTO\r')
+@pytest.mark.parametrize(
+    'telegram, expected',
+    [
+        ('-1.234KTO\r', (-1.234, 'K', 'T', 'O')),
+        ('+0.50NPE\r', (0.5, 'N', 'P', 'E')),
+        ('12KTO\r', (12.0, 'K', 'T', 'O')),
+    ],
+)
+def test_decode_telegram(telegram, expected):
+    assert decode_telegram(telegram) == expected
+
+
+@pytest.mark.parametrize('telegram', ['KTO\r', '1\r'])
+def test_decode_invalid_telegram_raises_telegram_error(telegram):
+    with pytest.raises(TelegramError):
+        decode_telegram(telegram)
 
 
 @pytest.mark.parametrize('SensorClass', [Imada, Sensor])
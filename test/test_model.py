@@ -1,15 +1,11 @@
 import pytest
-import time
+import functools
+import operator
 import numpy as np
+from sqlalchemy import func
 from sqlalchemy.exc import IntegrityError
 from sqlalchemy.inspection import inspect
-from cranio.utils import (
-    get_logging_levels,
-    generate_unique_id,
-    utc_datetime,
-    logger,
-    log_level_to_name,
-)
+from cranio.utils import generate_unique_id
 from cranio.model import (
     Patient,
     Session,
@@ -24,44 +20,52 @@ from cranio.model import (
 from cranio.producer import Sensor
 
 
+@functools.lru_cache(maxsize=None)
+def _primary_key_name(Table):
+    return inspect(Table).primary_key[0].name
+
+
 def assert_add_query_and_delete(rows, session, Table):
-    primary_key_name = inspect(Table).primary_key[0].name
-    # Add rows
-    for r in rows:
-        session.add(r)
+    primary_key_name = _primary_key_name(Table)
+    primary_key = getattr(Table, primary_key_name)
+    get_key = operator.attrgetter(primary_key_name)
+    # Add rows (return defaults to populate autogenerated primary keys)
+    session.bulk_save_objects(rows, return_defaults=True)
     # Query and verify row insert
-    results = session.query(Table).all()
-    original_keys = [getattr(r, primary_key_name) for r in rows]
-    queried_keys = [getattr(r, primary_key_name) for r in results]
-    for key in original_keys:
-        assert key in queried_keys
+    original_keys = [get_key(r) for r in rows]
+    queried_keys = {
+        key
+        for key, in session.query(primary_key).filter(primary_key.in_(original_keys))
+    }
+    assert queried_keys >= set(original_keys)
     # Delete rows
-    for r in rows:
-        session.delete(r)
+    session.query(Table).filter(primary_key.in_(original_keys)).delete(
+        synchronize_session=False
+    )
     # Query and verify deletion
-    results = session.query(Table).all()
-    queried_keys = [getattr(r, primary_key_name) for r in results]
-    for key in original_keys:
-        assert key not in queried_keys
+    remaining = (
+        session.query(func.count())
+        .select_from(Table)
+        .filter(primary_key.in_(original_keys))
+        .scalar()
+    )
+    assert remaining == 0
 
 
-def test_create_query_and_delete_patient(database_fixture):
-    with session_scope(database_fixture) as s:
-        assert_add_query_and_delete(
-            [Patient(patient_id=generate_unique_id())], s, Patient
-        )
+def test_create_query_and_delete_patient(sql_session):
+    assert_add_query_and_delete(
+        [Patient(patient_id=generate_unique_id())], sql_session, Patient
+    )
 
 
-def test_create_query_and_delete_session(database_fixture):
-    with session_scope(database_fixture) as s:
-        sessions = [Session()]
-        assert_add_query_and_delete(sessions, s, Session)
+def test_create_query_and_delete_session(sql_session):
+    assert_add_query_and_delete([Session()], sql_session, Session)
 
 
 def test_create_query_and_delete_document(database_fixture):
     session = pytest.helpers.add_session(database_fixture)
     patient = pytest.helpers.add_patient(database_fixture)
-    sensor_info = pytest.helpers.add_sensor_info(database_fixture)
+    sensor_info = pytest.helpers.get_sensor_info()
     with session_scope(database_fixture) as s:
         d = Document(
             session_id=session.session_id,
@@ -74,39 +78,41 @@ def test_create_query_and_delete_document(database_fixture):
 
 def test_create_query_and_delete_measurement(database_fixture):
     document, *_ = pytest.helpers.add_document_and_foreign_keys(database_fixture)
+    torques = np.random.RandomState(0).rand(10).tolist()
     with session_scope(database_fixture) as s:
         measurements = [
-            Measurement(
-                time_s=t, torque_Nm=np.random.rand(), document_id=document.document_id
-            )
-            for t in range(10)
+            Measurement(time_s=t, torque_Nm=y, document_id=document.document_id)
+            for t, y in enumerate(torques)
         ]
         assert_add_query_and_delete(measurements, s, Measurement)
 
 
-def test_database_init_populate_lookup_tables(database_fixture):
-    with session_scope(database_fixture) as s:
-        # Event types
-        event_types = s.query(EventType).all()
-        targets = EventType.event_types()
-        assert len(event_types) == len(targets)
-        for real, target in zip(event_types, targets):
-            assert real.event_type == target.event_type
-            assert real.event_type_description == target.event_type_description
-        # Distractor types
-        distractor_infos = s.query(DistractorInfo).all()
-        assert len(distractor_infos) == len(DistractorInfo.distractor_infos())
-        distractor_types = [d.distractor_type for d in distractor_infos]
-        assert DistractorType.KLS_ARNAUD in distractor_types
-        assert DistractorType.KLS_RED in distractor_types
+def test_database_init_populate_lookup_tables(sql_session):
+    # Event types
+    event_types = sql_session.query(
+        EventType.event_type, EventType.event_type_description
+    ).all()
+    targets = {
+        (e.event_type, e.event_type_description) for e in EventType.event_types()
+    }
+    assert len(event_types) == len(targets)
+    assert set(event_types) == targets
+    # Distractor types
+    distractor_types = {
+        d for d, in sql_session.query(DistractorInfo.distractor_type).all()
+    }
+    assert len(distractor_types) == len(DistractorInfo.distractor_infos())
+    assert DistractorType.KLS_ARNAUD in distractor_types
+    assert DistractorType.KLS_RED in distractor_types
 
 
 def test_create_query_and_delete_annotated_event(database_fixture):
     document, *_ = pytest.helpers.add_document_and_foreign_keys(database_fixture)
+    event_type = EventType.distraction_event_type().event_type
     with session_scope(database_fixture) as s:
         events = [
             AnnotatedEvent(
-                event_type=EventType.distraction_event_type().event_type,
+                event_type=event_type,
                 event_num=i,
                 document_id=document.document_id,
                 annotation_done=False,
@@ -117,17 +123,28 @@ def test_create_query_and_delete_annotated_event(database_fixture):
         assert_add_query_and_delete(events, s, AnnotatedEvent)
 
 
-@pytest.mark.skip('FIXME: IntegrityError is raised after add')
-def test_annotated_event_foreign_key_constraint(database_fixture):
-    with session_scope(database_fixture) as s:
-        with pytest.raises(IntegrityError):
-            s.add(
-                AnnotatedEvent(
-                    event_type=EventType.distraction_event_type().event_type,
-                    event_num=1,
-                    document_id=1337,
-                )
+def test_annotated_event_foreign_key_constraint(sql_session):
+    # Core insert executes immediately instead of on flush
+    with pytest.raises(IntegrityError):
+        sql_session.execute(
+            AnnotatedEvent.__table__.insert().values(
+                event_type=EventType.distraction_event_type().event_type,
+                event_num=1,
+                document_id=1337,
             )
+        )
+
+
+def test_add_existing_patient_raises_integrity_error(database_fixture):
+    patient_id = generate_unique_id()
+    Patient.add_new(patient_id=patient_id, database=database_fixture)
+    for _ in range(2):
+        with pytest.raises(IntegrityError):
+            Patient.add_new(patient_id=patient_id, database=database_fixture)
+    # Failed inserts are rolled back and the database remains usable
+    Patient.add_new(patient_id=generate_unique_id(), database=database_fixture)
+    with session_scope(database_fixture) as s:
+        assert s.query(Patient).count() == 2
 
 
 def test_get_time_series_related_to_document(database_fixture):
@@ -135,15 +152,11 @@ def test_get_time_series_related_to_document(database_fixture):
     # Generate data and associate with document
     n = 100
     x_arr = np.linspace(0, 1, n)
-    y_arr = np.random.rand(n)
-    measurements = [
-        Measurement(document_id=document.document_id, time_s=x, torque_Nm=y)
-        for x, y in zip(x_arr, y_arr)
-    ]
-    database_fixture.bulk_insert(measurements)
+    y_arr = np.random.RandomState(0).rand(n)
+    document.insert_time_series(database_fixture, x_arr.tolist(), y_arr.tolist())
     x, y = document.get_related_time_series(database_fixture)
-    np.testing.assert_array_almost_equal(x, x_arr)
-    np.testing.assert_array_almost_equal(y, y_arr)
+    assert np.allclose(np.fromiter(x, dtype=np.float64, count=n), x_arr, atol=1e-6)
+    assert np.allclose(np.fromiter(y, dtype=np.float64, count=n), y_arr, atol=1e-6)
 
 
 def test_get_non_existing_time_series_related_to_document(database_fixture):
@@ -152,10 +165,19 @@ def test_get_non_existing_time_series_related_to_document(database_fixture):
     assert len(x) == 0 and len(y) == 0
 
 
+def test_insert_empty_time_series_related_to_document(database_fixture):
+    document, *_ = pytest.helpers.add_document_and_foreign_keys(database_fixture)
+    document.insert_time_series(database_fixture, [], [])
+    x, y = document.get_related_time_series(database_fixture)
+    assert len(x) == 0 and len(y) == 0
+
+
 def test_enter_if_not_exists(database_fixture):
     document, *_ = pytest.helpers.add_document_and_foreign_keys(database_fixture)
-    for _ in range(10):
-        database_fixture.insert(document, insert_if_exists=False)
+    # Single transaction for all inserts
+    with session_scope(database_fixture) as s:
+        for _ in range(10):
+            database_fixture.insert(document, insert_if_exists=False, session=s)
     with session_scope(database_fixture) as s:
         n = (
             s.query(Document)
@@ -168,18 +190,28 @@ def test_enter_if_not_exists(database_fixture):
 def test_document_get_related_events_count_is_correct(database_fixture):
     document, *_ = pytest.helpers.add_document_and_foreign_keys(database_fixture)
     n = 10
-    annotated_events = [
-        AnnotatedEvent(
-            event_type=EventType.distraction_event_type().event_type,
-            event_num=i,
-            document_id=document.document_id,
-            annotation_done=False,
-            recorded=True,
+    event_type = EventType.distraction_event_type().event_type
+    with session_scope(database_fixture) as s:
+        s.bulk_insert_mappings(
+            AnnotatedEvent,
+            [
+                {
+                    'event_type': event_type,
+                    'event_num': i,
+                    'document_id': document.document_id,
+                    'annotation_done': False,
+                    'recorded': True,
+                }
+                for i in range(n)
+            ],
         )
-        for i in range(n)
-    ]
-    database_fixture.bulk_insert(annotated_events)
     assert len(document.get_related_events(database_fixture)) == n
+    assert document.get_related_events_count(database_fixture) == n
+
+
+def test_document_get_related_events_count_without_events_is_zero(database_fixture):
+    document, *_ = pytest.helpers.add_document_and_foreign_keys(database_fixture)
+    assert document.get_related_events_count(database_fixture) == 0
 
 
 def test_measurement_as_dict_returns_only_table_columns():
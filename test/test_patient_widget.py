@@ -15,3 +15,14 @@ def test_patient_widget_updates_patients_from_database(database_fixture):
     assert patient_widget.patient_count() == 1
     patient_widget.update_patients()
     assert patient_widget.patient_count() == 2
+
+
+def test_patient_widget_lists_all_patients_in_database(database_fixture):
+    n = 10
+    with database_fixture.session_scope() as s:
+        s.execute(
+            Patient.__table__.insert(),
+            [{'patient_id': generate_unique_id()} for _ in range(n)],
+        )
+    patient_widget = PatientWidget(database_fixture)
+    assert patient_widget.patient_count() == n
@@ -22,6 +22,13 @@ region_count = 4
 cranio.constants.PLOT_N_SECONDS = None
 
 
+@pytest.fixture(scope='module')
+def plot_widget():
+    """ Plot widget shared within the module. Only use in tests that overwrite the state they assert. """
+    widget = PlotWidget()
+    yield widget
+
+
 @pytest.fixture
 def region_plot_widget():
     widget = RegionPlotWidget()
@@ -58,6 +65,25 @@ def test_plot_widget_append_plot_data():
     assert w.y_arr == []
 
 
+def test_plot_widget_append_after_overwrite_keeps_only_new_data():
+    w = PlotWidget()
+    w.plot(range(100), range(100), PlotMode.APPEND)
+    w.plot([0, 1], [2, 3], PlotMode.OVERWRITE)
+    w.plot([2], [4], PlotMode.APPEND)
+    assert w.x_arr == [0, 1, 2]
+    assert w.y_arr == [2, 3, 4]
+
+
+@pytest.mark.parametrize('n, first', [(1000, 0), (10, 89)])
+def test_plot_widget_keeps_appended_data_within_filter(n, first):
+    w = PlotWidget()
+    w.add_filter(partial(filter_last_n_seconds, n=n))
+    for i in range(100):
+        w.plot([i], [2 * i], PlotMode.APPEND)
+    assert w.x_arr == list(range(first, 100))
+    assert w.y_arr == [2 * i for i in range(first, 100)]
+
+
 def test_plot_widget_dtypes():
     w = PlotWidget()
     x = [random.random() for _ in range(10)]
@@ -79,28 +105,39 @@ def test_plot_widget_dtypes():
     _assert_plot(x_pd, y_pd)
 
 
-def test_plot_widget_x_label():
-    p = PlotWidget()
-    label_map = {None: ''}
-    for c in string.printable:
-        label_map[c] = c
-    for i, o in label_map.items():
-        p.x_label = i
-        assert p.x_label == o, 'x_label: {} - output: {} (input: {})'.format(
-            p.x_label, o, i
-        )
+def test_plot_widget_downsamples_plotted_data_using_peak_method():
+    w = PlotWidget()
+    n = 10000
+    w.plot(np.arange(n), np.random.rand(n))
+    item = w.getPlotItem().listDataItems()[0]
+    assert item.opts['autoDownsample']
+    assert item.opts['downsampleMethod'] == 'peak'
+    assert item.opts['clipToView']
+    # Raw data is retained for the data arrays
+    assert len(w.x_arr) == n
+
+
+@pytest.mark.parametrize('label', [None] + list(string.printable))
+def test_plot_widget_x_label(plot_widget, label):
+    plot_widget.x_label = label
+    assert plot_widget.x_label == (label or '')
+
+
+@pytest.mark.parametrize('label', [None] + list(string.printable))
+def test_plot_widget_y_label(plot_widget, label):
+    plot_widget.y_label = label
+    assert plot_widget.y_label == (label or '')
 
 
-def test_plot_widget_y_label():
-    p = PlotWidget()
-    label_map = {None: ''}
-    for c in string.printable:
-        label_map[c] = c
-    for i, o in label_map.items():
-        p.y_label = i
-        assert p.y_label == o, 'y_label: {} - output: {} (input: {})'.format(
-            p.y_label, o, i
-        )
+def test_plot_widget_assigning_same_label_does_not_relabel_axis(monkeypatch):
+    w = PlotWidget()
+    w.x_label = 'foo'
+    calls = []
+    monkeypatch.setattr(w, 'setLabel', lambda *args, **kwargs: calls.append(args))
+    w.x_label = 'foo'
+    assert calls == []
+    w.x_label = 'bar'
+    assert calls == [('bottom', 'bar')]
 
 
 def test_plot_widget_filter_last_10_seconds_excludes_entries_older_than_10_seconds_from_the_plot():
@@ -153,6 +190,14 @@ def test_vmulti_plot_widget_clear_all_plots():
         assert len(pw.y_arr) == 0
 
 
+def test_vmulti_plot_widget_reset_forgets_plot_labels():
+    p = VMultiPlotWidget()
+    p.add_plot_widget('foo')
+    p.reset()
+    assert p.find_plot_widget_by_label('foo') is None
+    assert p.add_plot_widget('foo') is not None
+
+
 def test_region_plot_widget_add_region(region_plot_widget):
     n = 100
     region_plot_widget.plot(x_arr=list(range(n)), y_arr=list(range(n)))
@@ -166,6 +211,19 @@ def test_region_plot_widget_add_region(region_plot_widget):
         assert widget.region() == (0, 1)
 
 
+def test_region_plot_widget_add_regions_shares_default_bounds(region_plot_widget):
+    n = 100
+    region_plot_widget.plot(x_arr=list(range(n)), y_arr=list(range(n)))
+    edges_list = [(0, 10), (20, 30), (40, 50)]
+    edit_widgets = region_plot_widget.add_regions(edges_list)
+    assert [w.region() for w in edit_widgets] == edges_list
+    assert [w.event_number for w in edit_widgets] == [1, 2, 3]
+    # Regions are bounded to the plotted data
+    for edit_widget in edit_widgets:
+        item = region_plot_widget.find_region_by_edit(edit_widget)
+        assert list(item.lines[0].maxRange) == [0, n - 1]
+
+
 def test_region_plot_widget_remove_region(region_plot_widget):
     n = 100
     region_plot_widget.plot(x_arr=list(range(n)), y_arr=list(range(n)))
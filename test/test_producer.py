@@ -1,17 +1,35 @@
+import pytest
 import numpy as np
 import datetime
 from cranio.producer import datetime_to_seconds, create_dummy_sensor, Sensor
 
+t0 = datetime.datetime(2017, 12, 18, 17, 13, 45)
 
-def test_datetime_to_seconds():
-    t0 = datetime.datetime.utcnow()
-    for arr in (
-        datetime.datetime.utcnow(),
-        [datetime.datetime.utcnow()],
-        np.datetime64('2017-12-18T17:13:45.351738000'),
-        [np.datetime64('2017-12-18T17:13:45.351738000')],
-    ):
-        datetime_to_seconds(arr, t0)
+
+@pytest.mark.parametrize(
+    'arr, expected',
+    [
+        (t0 + datetime.timedelta(seconds=1.5), 1.5),
+        ([t0 + datetime.timedelta(seconds=1.5)], [1.5]),
+        ([t0, t0 + datetime.timedelta(seconds=1.5)], [0, 1.5]),
+        (np.datetime64('2017-12-18T17:13:45.351738000'), 0.351738),
+        ([np.datetime64('2017-12-18T17:13:45.351738000')], [0.351738]),
+    ],
+    ids=[
+        'datetime',
+        'datetime list',
+        'reference list',
+        'datetime64',
+        'datetime64 list',
+    ],
+)
+def test_datetime_to_seconds(arr, expected):
+    seconds = datetime_to_seconds(arr, t0)
+    # Scalar input -> float, list input -> list of the same length
+    assert type(seconds) == type(expected)
+    if isinstance(expected, list):
+        assert len(seconds) == len(arr)
+    assert seconds == pytest.approx(expected)
 
 
 def test_create_dummy_sensor_returns_sensor():
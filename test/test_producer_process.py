@@ -1,12 +1,13 @@
 import pytest
-import random
 import time
+import multiprocessing
 import pandas as pd
 from cranio.producer import ChannelInfo, Sensor, Producer, get_all_from_queue
+from cranio.utils import random_value_generator
 
 
-def random_value_generator():
-    return random.gauss(0, 1)
+def _put_random_values(queue, n: int):
+    queue.put([random_value_generator() for _ in range(n)])
 
 
 def test_channel_info():
@@ -41,7 +42,8 @@ def test_producer_process_start_and_join(producer_process):
     p = producer_process
     p.start()
     assert p.is_alive()
-    time.sleep(1)
+    # Stay alive over a few start event polling intervals
+    time.sleep(3 * p.pause_poll_interval)
     assert p.is_alive()
     p.pause()
     assert p.is_alive()
@@ -68,8 +70,8 @@ def test_producer_process_with_sensors(producer_process):
     p.producer.register_sensor(s)
     p.start()
     assert p.is_alive()
-    # Record for 2 seconds
-    time.sleep(2)
+    # Record until the first values are produced (at most 2 seconds)
+    assert pytest.helpers.wait_until(lambda: not p.queue.empty())
     p.pause()
     # Read values from queue
     index_arr, value_arr = get_all_from_queue(p.queue)
@@ -77,3 +79,25 @@ def test_producer_process_with_sensors(producer_process):
     df = pd.DataFrame(value_arr, index=index_arr)
     for c in channels:
         assert str(c) in df
+
+
+@pytest.mark.skipif(
+    'fork' not in multiprocessing.get_all_start_methods(), reason='Requires fork'
+)
+def test_random_value_generator_differs_between_forked_processes():
+    n = 3
+    context = multiprocessing.get_context('fork')
+    queue = context.Queue()
+    # Start consuming a batch in the parent before forking
+    random_value_generator()
+    processes = [
+        context.Process(target=_put_random_values, args=(queue, n)) for _ in range(2)
+    ]
+    for p in processes:
+        p.start()
+    child_values = [queue.get(timeout=5) for _ in processes]
+    for p in processes:
+        p.join()
+    parent_values = [random_value_generator() for _ in range(n)]
+    assert child_values[0] != child_values[1]
+    assert parent_values not in child_values
@@ -1,5 +1,4 @@
 import pytest
-import time
 from PyQt5.QtCore import QEvent, Qt
 from cranio.app import app
 from cranio.state import AreYouSureState
@@ -43,9 +42,9 @@ def test_start_measurement_inserts_document_and_sensor_info_to_database(machine)
 
 def test_stop_measurement_pauses_producer_and_inserts_measurements_to_database(machine):
     pytest.helpers.transition_machine_to_s1(machine)
-    # start measurement for 2 seconds
+    # start measurement and record until the first values are produced (at most 2 seconds)
     machine.main_window.measurement_widget.start_button.clicked.emit()
-    time.sleep(2)
+    assert pytest.helpers.wait_until(lambda: not machine.producer_process.queue.empty())
     app.processEvents()
     # stop measurement
     machine.main_window.measurement_widget.stop_button.clicked.emit()
@@ -257,6 +256,7 @@ def test_note_state_number_of_full_turns_equals_number_of_annotated_events_times
     )
     state = state_machine.s6
     event_count = 3
+    event_type = EventType.distraction_event_type().event_type
     # Generate and insert annotated events
     state_machine.database.bulk_insert(
         [
@@ -267,7 +267,7 @@ def test_note_state_number_of_full_turns_equals_number_of_annotated_events_times
                 event_num=i + 1,
                 annotation_done=True,
                 recorded=True,
-                event_type=EventType.distraction_event_type().event_type,
+                event_type=event_type,
             )
             for i in range(event_count)
         ]